@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 
 from os import environ
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,6 +28,9 @@ SECRET_KEY = environ.get("SECRET_KEY", "change_me")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = bool(int(environ.get("DEBUG", 0)))
 
+# True when running the test suite with `python manage.py test` or pytest.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
 ALLOWED_HOSTS = []
 ALLOWED_HOSTS.extend(
     filter(
@@ -94,6 +98,8 @@ DATABASES = {
         'NAME': environ.get('DB_NAME'),
         'USER': environ.get('DB_USER'),
         'PASSWORD': environ.get('DB_PASS'),
+        # Reuse connections across requests instead of reconnecting each time.
+        'CONN_MAX_AGE': int(environ.get('DB_CONN_MAX_AGE', 60)),
     }
 }
 
@@ -116,6 +122,12 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing is deliberately slow; tests only need a working hasher.
+if TESTING:
+    PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
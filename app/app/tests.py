@@ -1,4 +1,41 @@
 """
 Tests for main app
 """
-from django.test import SimpleTestCase
\ No newline at end of file
+import ast
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.test import SimpleTestCase
+
+
+def find_test_modules():
+    """Return every test module in the project."""
+    return settings.BASE_DIR.glob('**/test*.py')
+
+
+class TestSuiteTests(SimpleTestCase):
+    """Test conventions of the test suite itself."""
+    def test_fast_password_hasher(self):
+        """Test the suite does not pay for production password hashing."""
+        self.assertTrue(settings.TESTING)
+        self.assertEqual(get_hasher().algorithm, 'md5')
+
+    def test_no_transaction_test_case(self):
+        """Test no test class truncates tables between tests.
+
+        TransactionTestCase flushes the database after every test, which is
+        far slower than TestCase's rollback. Use TestCase unless a test
+        really needs to observe committed transactions.
+        """
+        offenders = []
+        for path in find_test_modules():
+            tree = ast.parse(path.read_text())
+            for node in ast.walk(tree):
+                if not isinstance(node, ast.ClassDef):
+                    continue
+                for base in node.bases:
+                    name = getattr(base, 'id', getattr(base, 'attr', None))
+                    if name == 'TransactionTestCase':
+                        offenders.append(f'{path.name}:{node.name}')
+
+        self.assertEqual(offenders, [])
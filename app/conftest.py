@@ -0,0 +1,52 @@
+"""
+Pytest configuration for the Django test suite.
+"""
+import hashlib
+from pathlib import Path
+
+import pytest
+
+MIGRATIONS_HASH_KEY = 'recipe_app/migrations_hash'
+
+
+def _migrations_hash():
+    """Return a hash of every migration file in the project."""
+    base_dir = Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for path in sorted(base_dir.glob('*/migrations/*.py')):
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _migrations_hash_key(config):
+    """Return the cache key for this process's test database.
+
+    pytest-django keeps a separate database per xdist worker, plus one
+    for runs without xdist, so each one records its own hash.
+    """
+    workerinput = getattr(config, 'workerinput', None)
+    worker_id = workerinput['workerid'] if workerinput else 'master'
+    return f'{MIGRATIONS_HASH_KEY}/{worker_id}'
+
+
+def pytest_configure(config):
+    """Recreate the reused test database when migrations have changed."""
+    cache = getattr(config, 'cache', None)
+    if cache is None:
+        return
+    config.migrations_hash = _migrations_hash()
+    config.migrations_hash_key = _migrations_hash_key(config)
+    cached_hash = cache.get(config.migrations_hash_key, None)
+    if cached_hash != config.migrations_hash:
+        config.option.create_db = True
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(request, django_db_setup):
+    """Remember the migrations the test database was built from."""
+    migrations_hash = getattr(request.config, 'migrations_hash', None)
+    if migrations_hash is not None:
+        request.config.cache.set(
+            request.config.migrations_hash_key, migrations_hash
+        )
@@ -2,8 +2,6 @@
 Django admin customization
 """
 
-from array import array
-from typing import List
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy
@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    """Merge tags and ingredients sharing a user and name into one row."""
+    Recipe = apps.get_model('core', 'Recipe')
+    for field_name in ('tags', 'ingredients'):
+        field = Recipe._meta.get_field(field_name)
+        model = field.related_model
+        through = field.remote_field.through
+        fk_name = f'{model._meta.model_name}_id'
+        duplicates = model.objects.values('user', 'name').annotate(
+            keep_id=Min('id'),
+            count=Count('id'),
+        ).filter(count__gt=1)
+        for duplicate in duplicates:
+            keep_id = duplicate['keep_id']
+            extra_ids = list(model.objects.filter(
+                user=duplicate['user'],
+                name=duplicate['name'],
+            ).exclude(id=keep_id).values_list('id', flat=True))
+            recipe_ids = set(through.objects.filter(
+                **{f'{fk_name}__in': extra_ids}
+            ).values_list('recipe_id', flat=True))
+            recipe_ids -= set(through.objects.filter(
+                **{fk_name: keep_id}
+            ).values_list('recipe_id', flat=True))
+            through.objects.bulk_create([
+                through(recipe_id=recipe_id, **{fk_name: keep_id})
+                for recipe_id in recipe_ids
+            ])
+            model.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,9 @@
 """
 Database Models.
 """
+import os
 import uuid
-from pathlib import PurePath
 
-from operator import mod
-from unittest.util import _MAX_LENGTH
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -16,10 +14,9 @@ from django.conf import settings
 
 def recipe_image_file_path(instance, filename):
     """Generate filepath for new recipe image."""
-    pure_filename = PurePath(filename)
-    filename = f'{uuid.uuid4()}{pure_filename.suffix}'
+    ext = os.path.splitext(filename)[1]
 
-    return str(PurePath('uploads', 'recipe', filename))
+    return f'uploads/recipe/{uuid.uuid4().hex}{ext}'
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -76,6 +73,14 @@ class Tag(models.Model):
     )
     name = models.CharField(max_length=255)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_tag_user_name',
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -87,5 +92,13 @@ class Ingredient(models.Model):
     )
     name = models.CharField(max_length=255)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_ingredient_user_name',
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.name
\ No newline at end of file
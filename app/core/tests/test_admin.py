@@ -2,23 +2,24 @@
 Test for the Django admin modifications
 """
 
-from django.test import TestCase, Client
+from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+User = get_user_model()
+
 class AdminSiteTests(TestCase):
     """
     Tests for Django Admin.
     """
     def setUp(self):
-        """Create user and client"""
-        self.client = Client()
-        self.admin_user = get_user_model().objects.create_superuser(
+        """Create user and log in the test client"""
+        self.admin_user = User.objects.create_superuser(
             email='admin@example.com',
             password='password+123'
         )
         self.client.force_login(self.admin_user)
-        self.user = get_user_model().objects.create_user(
+        self.user = User.objects.create_user(
             email="user@example.com",
             password="password+123",
             name="Test User"
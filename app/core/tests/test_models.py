@@ -4,14 +4,17 @@ Tests for models.
 from unittest.mock import patch
 from decimal import Decimal
 
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
 from core import models
 
+User = get_user_model()
+
 def create_user(email='user@example.com', password='TestPass+123'):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(email, password)
+    return User.objects.create_user(email, password)
 
 class ModelTests(TestCase):
     """Test Models."""
@@ -19,8 +22,7 @@ class ModelTests(TestCase):
         """Test creating a user with an email is successful"""
         email = "Test@example.com"
         password = "testpassword+123"
-        UserModel = get_user_model()
-        user = UserModel.objects.create_user(
+        user = User.objects.create_user(
             email=email,
             password=password
         )
@@ -36,22 +38,20 @@ class ModelTests(TestCase):
             ['TEST3@EXAMPLE.COM', 'TEST3@example.com'],
             ['test4@example.CoM', 'test4@example.com'],
         ]
-        UserModel = get_user_model()
 
         #Typical syntax for multi-element array values
         for email, expected in sample_emails:
-            user = UserModel.objects.create_user(email, 'password+1234')
+            user = User.objects.create_user(email, 'password+1234')
             self.assertEqual(user.email, expected)
 
     def test_new_user_without_email_raises_error(self):
         """Test that creating a user without an email raises a ValueError."""
         with self.assertRaises(ValueError):
-            get_user_model().objects.create_user('', 'password+1234')
+            User.objects.create_user('', 'password+1234')
             
     def test_create_superuser(self):
         """Test creating a superuser."""
-        UserModel = get_user_model()
-        user = UserModel.objects.create_superuser(
+        user = User.objects.create_superuser(
             'test@example.com',
             'password+1234'
         )
@@ -60,7 +60,7 @@ class ModelTests(TestCase):
     
     def test_create_recipe(self):
         """Test creating a recipe is successful."""
-        user = get_user_model().objects.create_user(
+        user = User.objects.create_user(
             'test@example.com',
             'testpassword123'
         )
@@ -81,6 +81,14 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(tag), tag.name)
 
+    def test_tag_name_unique_per_user(self):
+        """Test a user cannot have two tags with the same name."""
+        user = create_user()
+        models.Tag.objects.create(user=user, name='tag1')
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name='tag1')
+
     def test_create_ingredient(self):
         """Test for creating an ingredient successfully."""
         test_user = create_user()
@@ -89,11 +97,19 @@ class ModelTests(TestCase):
 
         self.assertEqual(ingredient.name, str(test_ingredient_name))
 
+    def test_ingredient_name_unique_per_user(self):
+        """Test a user cannot have two ingredients with the same name."""
+        user = create_user()
+        models.Ingredient.objects.create(user=user, name='Tomato')
+
+        with self.assertRaises(IntegrityError):
+            models.Ingredient.objects.create(user=user, name='Tomato')
+
     @patch('core.models.uuid.uuid4')
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test generating image path."""
         uuid = 'test-uuid'
-        mock_uuid.return_value = uuid
+        mock_uuid.return_value.hex = uuid
         file_path = models.recipe_image_file_path(None, 'example.jpg')
 
         self.assertEqual(file_path, f'uploads/recipe/{uuid}.jpg')
\ No newline at end of file
@@ -2,18 +2,38 @@
 Serializers for recipe APIs.
 """
 
-from attr import validate
+from functools import cached_property
+
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
 from core.models import (Recipe, Tag, Ingredient)
 
-class IngredientSerializer(serializers.ModelSerializer):
+class BaseRecipeAttrSerializer(serializers.ModelSerializer):
+    """Base serializer for recipe attributes."""
+    def validate_name(self, value):
+        """Check the user has no other object with this name."""
+        # nested in a recipe, existing names are reused there
+        if self.parent is not None:
+            return value
+        queryset = self.Meta.model.objects.filter(
+            user=self.context['request'].user,
+            name=value,
+        )
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError('This name is already in use.')
+        return value
+
+class IngredientSerializer(BaseRecipeAttrSerializer):
     """Serializer for Ingredients model."""
     class Meta:
         model = Ingredient
         fields = ['id', 'name'] #'__all__' does not work w/endpoint
         read_only_fields = ['id']
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(BaseRecipeAttrSerializer):
     """Serializer for tags."""
     class Meta:
         model = Tag
@@ -30,28 +50,51 @@ class RecipeSerializer(serializers.ModelSerializer):
         #fields = []
         exclude = ['user', 'description']
         read_only_fields = ['id']
+        PREFETCH = (
+            Prefetch(
+                'tags',
+                queryset=Tag.objects.only(*TagSerializer.Meta.fields),
+            ),
+            Prefetch(
+                'ingredients',
+                queryset=Ingredient.objects.only(
+                    *IngredientSerializer.Meta.fields
+                ),
+            ),
+        ) # related fields for views to prefetch, avoids N+1 queries
+
+    @cached_property
+    def _auth_user(self):
+        """The user making the request, looked up once per serializer."""
+        return self.context['request'].user
+
+    def _get_or_create_objects(self, model, items):
+        """Fetch or bulk create named objects for the authenticated user."""
+        auth_user = self._auth_user
+        names = list(dict.fromkeys(item['name'] for item in items))
+            # unique names, keeping payload order
+        model.objects.bulk_create(
+            [model(user=auth_user, name=name) for name in names],
+            ignore_conflicts=True,
+        ) # existing (user, name) rows are skipped by the unique constraint
+        objs = {
+            obj.name: obj
+            for obj in model.objects.filter(user=auth_user, name__in=names)
+        }
+        return [objs[name] for name in names]
 
     def _get_or_create_tags(self, tags, recipe):
         """Handle getting or creating tags as needed."""
-        auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
-    
+        tag_objs = self._get_or_create_objects(Tag, tags)
+        recipe.tags.add(*tag_objs)
+
     def _get_or_create_ingredients(self, ingredients, recipe):
         """Handle getting or creating ingredients as needed."""
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            ) # Get or Create new ingredient
-            recipe.ingredients.add(ingredient_obj)
-                # Add incredient to ManyToManyField
+        ingredient_objs = self._get_or_create_objects(Ingredient, ingredients)
+        recipe.ingredients.add(*ingredient_objs)
+            # Add ingredients to ManyToManyField in a single insert
 
+    @transaction.atomic
     def create(self, validated_data) -> Recipe:
         """Create a recipe, allowing for nested TagSerializer."""
         tags = validated_data.pop('tags', [])
@@ -64,20 +107,20 @@ class RecipeSerializer(serializers.ModelSerializer):
             # create or assign ingredients as needed
         return recipe
     
+    @transaction.atomic
     def update(self, instance, validated_data) -> Recipe:
         """Update a recipe, allowing for nested TagSerializer."""
         tags = validated_data.pop('tags', None)
         ingredients = validated_data.pop('ingredients', None)
 
         if tags is not None:
-            instance.tags.clear()
-                # remove old tags
-            self._get_or_create_tags(tags, instance)
-                # create or assign tags as needed
+            instance.tags.set(self._get_or_create_objects(Tag, tags))
+                # only adds new tags and removes dropped ones
 
         if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            instance.ingredients.set(
+                self._get_or_create_objects(Ingredient, ingredients)
+            )
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
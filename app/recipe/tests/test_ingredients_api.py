@@ -4,9 +4,8 @@ Tests for the ingredients API
 from decimal import Decimal
 from sys import stdout
 from unicodedata import decimal
-from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -15,24 +14,22 @@ from core.models import Ingredient, User, Recipe
 from recipe.serializers import IngredientSerializer
 
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
-
-def create_payload(**kwargs):
-    """Creates and returns a dictionary."""
-    return kwargs
+INGREDIENT_DETAIL_PREFIX = reverse(
+    'recipe:ingredient-detail', args=[0]
+).rsplit('0/', 1)[0]
 
 def detail_url(ingredient_id):
     """Create and return an ingredient detail URL."""
-    return reverse('recipe:ingredient-detail', args=[ingredient_id])
+    return f'{INGREDIENT_DETAIL_PREFIX}{ingredient_id}/'
 
 
 def create_user(email="email@example.com", password="TestPass+123") -> User:
     """Create and return user."""
-    return get_user_model().objects.create_user(email=email, password=password)
+    return User.objects.create_user(email=email, password=password)
 
-class PublicIngredientsApiTests(TestCase):
+class PublicIngredientsApiTests(SimpleTestCase):
     """Test unauthenticated API requests."""
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test auth is required for retrieving ingredients list."""
@@ -41,25 +38,35 @@ class PublicIngredientsApiTests(TestCase):
 
 class PrivateIngredientsApiTests(TestCase):
     """Test authenticated API requests."""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self):
-        self.client = APIClient()
-        self.user = create_user()
         self.client.force_authenticate(self.user)
     
     def test_retrieve_ingredients(self):
         """Test retrieving a list of ingredients."""
-        Ingredient.objects.create(user=self.user, name="Garlic")
-        Ingredient.objects.create(user=self.user, name="Tomato")
-        Ingredient.objects.create(user=self.user, name="Kale")
+        Ingredient.objects.bulk_create([
+            Ingredient(user=self.user, name="Garlic"),
+            Ingredient(user=self.user, name="Tomato"),
+            Ingredient(user=self.user, name="Kale"),
+        ])
 
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        ingredients = Ingredient.objects.all().order_by('-name')
-        serialized_ingredients = IngredientSerializer(ingredients, many=True)
+        ingredients = Ingredient.objects.order_by('-name').values_list(
+            'id', 'name'
+        ) # compare rows directly rather than serializing twice
 
-        self.assertEqual(res.data, serialized_ingredients.data)
+        self.assertEqual(
+            [(item['id'], item['name']) for item in res.data],
+            list(ingredients),
+        )
 
     def test_ingredients_limited_to_user(self):
         """Test list of ingredients is limited to Authenticated user."""
@@ -81,7 +88,7 @@ class PrivateIngredientsApiTests(TestCase):
         """Test updating an ingredient."""
         ingredient = Ingredient.objects.create(user=self.user, name='Garlic')
             # Create init ingredient
-        payload = create_payload(name='Ginger')
+        payload = {'name': 'Ginger'}
             # Create payload to send
         update_url = detail_url(ingredient.pk)
             # Create PATH with PK value
@@ -97,6 +104,19 @@ class PrivateIngredientsApiTests(TestCase):
         self.assertEqual(payload['name'], ingredient.name)
         self.assertEqual(res.data.get('id'), ingredient.pk)
     
+    def test_update_ingredient_duplicate_name(self):
+        """Test renaming an ingredient to a name the user already has fails."""
+        Ingredient.objects.create(user=self.user, name='Garlic')
+        ingredient = Ingredient.objects.create(user=self.user, name='Ginger')
+
+        res = self.client.patch(
+            detail_url(ingredient.pk), {'name': 'Garlic'}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        ingredient.refresh_from_db()
+        self.assertEqual(ingredient.name, 'Ginger')
+
     def test_deleting_ingredients(self):
         """Test for deleting ingredients with endpoint."""
         ingredient1 = Ingredient.objects.create(user=self.user, name="salt")
@@ -7,10 +7,11 @@ from typing import Reversible
 
 import tempfile
 import os
+from types import MappingProxyType
 from PIL import Image
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 
 from rest_framework import status
@@ -23,39 +24,47 @@ from recipe.serializers import (
 )
 import sys
 
+User = get_user_model()
+
 RECIPES_URL = reverse('recipe:recipe-list')
+RECIPE_DETAIL_PREFIX = reverse(
+    'recipe:recipe-detail', args=[0]
+).rsplit('0/', 1)[0]
 
 def detail_url(recipe_id):
     """create and return a recipe detail URL."""
-    return reverse('recipe:recipe-detail', args=[recipe_id])
+    return f'{RECIPE_DETAIL_PREFIX}{recipe_id}/'
 
 def image_upload_url(recipe_id):
     """Create and return an image upload URL."""
-    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+    return f'{RECIPE_DETAIL_PREFIX}{recipe_id}/upload-image/'
+
+RECIPE_DEFAULTS = MappingProxyType({
+    'title': 'Sample recipe title',
+    'time_minutes': 22,
+    'price': Decimal('10.69'),
+    'description': 'Sample Description, super yummy.',
+    'link': 'http://example.com/recipe.pdf',
+}) # read-only, shared by every sample recipe
 
 def create_recipe(user, **params):
     """Create and return a sample recipe."""
-    defaults = {
-        'title': 'Sample recipe title',
-        'time_minutes': 22,
-        'price': Decimal(10.69),
-        'description': 'Sample Description, super yummy.',
-        'link': 'http://example.com/recipe.pdf',
-    }
-    defaults.update(params)
-
-    recipe = Recipe.objects.create(user=user, **defaults)
-    return recipe
+    return Recipe.objects.create(user=user, **{**RECIPE_DEFAULTS, **params})
+
+def bulk_create_recipes(user, specs):
+    """Create and return sample recipes with a single INSERT."""
+    return Recipe.objects.bulk_create([
+        Recipe(user=user, **{**RECIPE_DEFAULTS, **spec}) for spec in specs
+    ])
 
 def create_user(**params):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
+    return User.objects.create_user(**params)
 
 
-class PublicRecipeAPITests(TestCase):
+class PublicRecipeAPITests(SimpleTestCase):
     """Test unauthenticated API requests."""
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test auth is required to call API."""
@@ -66,21 +75,29 @@ class PublicRecipeAPITests(TestCase):
 
 class PrivateRecipeAPITests(TestCase):
     """Test authenticated API requests."""
-    def setUp(self) -> None:
-        self.client = APIClient()
-        self.user = create_user(
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='user@example.com',
             password='testpass123',
         )
+
+    def setUp(self) -> None:
         self.client.force_authenticate(self.user)
     
     def test_retrieve_recipes(self):
         """Test retrieving a list of recipes."""
-        create_recipe(user=self.user)
-        create_recipe(user=self.user, title='second recipe')
-        create_recipe(user=self.user, title='third recipe', time_minutes=20)
-        
-        res = self.client.get(RECIPES_URL)
+        bulk_create_recipes(self.user, [
+            {},
+            {'title': 'second recipe'},
+            {'title': 'third recipe', 'time_minutes': 20},
+        ])
+
+        with self.assertNumQueries(3):
+            # recipes, then one prefetch each for tags and ingredients
+            res = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
@@ -95,11 +112,14 @@ class PrivateRecipeAPITests(TestCase):
             password='testpass1234',
         )
         create_recipe(user=other_user)
-        create_recipe(user=self.user, title='second recipe')
-        create_recipe(user=self.user, title='third recipe', time_minutes=20)
+        bulk_create_recipes(self.user, [
+            {'title': 'second recipe'},
+            {'title': 'third recipe', 'time_minutes': 20},
+        ])
 
         # Make GET request to RECIPES_URL
-        res = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.filter(user=self.user).order_by('-id')
         serialized_recipes = RecipeSerializer(recipes, many=True)
@@ -107,6 +127,26 @@ class PrivateRecipeAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serialized_recipes.data)
 
+    def test_retrieve_recipes_prefetches_related(self):
+        """Test listing recipes does not query tags/ingredients per recipe."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        ingredient = Ingredient.objects.create(user=self.user, name='Rice')
+        for title in ('first recipe', 'second recipe', 'third recipe'):
+            recipe = create_recipe(user=self.user, title=title)
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 3)
+        for recipe in res.data:
+            self.assertEqual(recipe['tags'][0]['name'], tag.name)
+            self.assertEqual(
+                recipe['ingredients'][0]['name'], ingredient.name
+            )
+
     def test_get_recipe_detail(self):
         """Test getting recipe details."""
         recipe = create_recipe(user=self.user)
@@ -162,10 +202,7 @@ class PrivateRecipeAPITests(TestCase):
             description='Initial recipe description, yummy',
         ) # creating Recipe in database
 
-        def create_payload(**kwargs):
-            return kwargs
-
-        payload = create_payload(
+        payload = dict(
             title='Updated Recipe Title',
             link='https://example.com/recipe02',
             description='Updated recipe description',
@@ -209,7 +246,7 @@ class PrivateRecipeAPITests(TestCase):
             # Send DELETE to correct endpoint.
         
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Recipe.objects.filter(id=recipe.id).exists())
+        self.assertFalse(Recipe.objects.filter(pk=recipe.id).exists())
     
     def test_delete_other_user_recipe_error(self):
         """Test trying to delete other user's recipe gives error."""
@@ -227,9 +264,7 @@ class PrivateRecipeAPITests(TestCase):
     
     def test_create_recipe_with_new_tags(self) -> None:
         """Test creating a recipe with new tags."""
-        def payload_maker(**kwargs) -> dict:
-            return kwargs
-        payload = payload_maker(
+        payload = dict(
             title='Thai Prawn Curry',
             time_minutes=30,
             price=Decimal('12.50'),
@@ -242,19 +277,16 @@ class PrivateRecipeAPITests(TestCase):
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
+        tag_names = set(
+            recipe.tags.filter(user=self.user).values_list('name', flat=True)
+        )
         for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+            self.assertIn(tag['name'], tag_names)
     
     def test_create_recipe_with_existing_tags(self) -> None:
         """Test creating a recipe with existing tag."""
         tag_vegan = Tag.objects.create(user=self.user, name='Vegan')
-        def payload_maker(**kwargs) -> dict:
-            return kwargs
-        payload = payload_maker(
+        payload = dict(
             title='Tofu Stir-Fry',
             time_minutes=20,
             price=Decimal('9.99'),
@@ -269,12 +301,11 @@ class PrivateRecipeAPITests(TestCase):
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
         self.assertIn(tag_vegan, recipe.tags.all())
+        tag_names = set(
+            recipe.tags.filter(user=self.user).values_list('name', flat=True)
+        )
         for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+            self.assertIn(tag['name'], tag_names)
     
     def test_create_tag_on_update(self):
         """Test creating tag when updating a recipe."""
@@ -291,12 +322,13 @@ class PrivateRecipeAPITests(TestCase):
     
     def test_update_recipe_assign_tag(self):
         """Test assigning an existing tag when updating a recipe."""
-        tag_breakfast = Tag.objects.create(user=self.user, name='Breakfast')
+        tag_breakfast, tag_lunch = Tag.objects.bulk_create([
+            Tag(user=self.user, name='Breakfast'),
+            Tag(user=self.user, name='Lunch'),
+        ])
         recipe = create_recipe(user=self.user)
         recipe.tags.add(tag_breakfast)
             # Adding "Breakfast" tag to the recipe
-        
-        tag_lunch = Tag.objects.create(user=self.user, name="Lunch")
 
         payload = {'tags': [{'name': 'Lunch'}]}
         url = detail_url(recipe.id)
@@ -308,6 +340,24 @@ class PrivateRecipeAPITests(TestCase):
         self.assertNotIn(tag_breakfast, recipe.tags.all())
             # Check the "Breakfast" was removed from the recipe tags. 
     
+    def test_update_recipe_keeps_unchanged_tags(self):
+        """Test updating tags leaves tags that are still assigned alone."""
+        tag_breakfast = Tag.objects.create(user=self.user, name='Breakfast')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag_breakfast)
+        link = Recipe.tags.through.objects.get(recipe=recipe)
+            # M2M row linking "Breakfast" to the recipe
+
+        payload = {'tags': [{'name': 'Breakfast'}, {'name': 'Lunch'}]}
+        url = detail_url(recipe.id)
+        res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe.tags.count(), 2)
+        self.assertTrue(
+            Recipe.tags.through.objects.filter(pk=link.pk).exists()
+        ) # "Breakfast" row was not deleted and re-inserted
+
     def test_clear_recipe_tags(self):
         """Test clearing a recipe tags."""
         tag = Tag.objects.create(user=self.user, name="Dessert")
@@ -324,10 +374,8 @@ class PrivateRecipeAPITests(TestCase):
     
     def test_create_recipe_with_new_ingredients(self):
         """Test creating a recipe with new ingredients."""
-        def payload_maker(**kwargs) -> dict:
-            return kwargs
         ingredient_list = [{'name': 'salt'}, {'name': 'pepper'}, {'name': 'onion'}, {'name': 'apple'},]
-        payload = payload_maker(
+        payload = dict(
             title='Tofu Stir-Fry',
             time_minutes=20,
             price=Decimal('9.99'),
@@ -342,25 +390,26 @@ class PrivateRecipeAPITests(TestCase):
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 4)
+        ingredient_names = set(
+            recipe.ingredients.filter(
+                user=self.user
+            ).values_list('name', flat=True)
+        )
         for _ing in payload['ingredients']:
             # Loop through all in payload, and ensure they exist in recipe
-            exists = recipe.ingredients.filter(
-                name=_ing['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+            self.assertIn(_ing['name'], ingredient_names)
 
     def test_create_recipe_with_existing_ingredients(self):
         """Test creating a new recipe with existing ingredients."""
-        ingredient1 = Ingredient.objects.create(user=self.user, name="broccoli")
-        ingredient2 = Ingredient.objects.create(user=self.user, name="noodles")
+        ingredient1, ingredient2 = Ingredient.objects.bulk_create([
+            Ingredient(user=self.user, name="broccoli"),
+            Ingredient(user=self.user, name="noodles"),
+        ])
 
         ingredients = Ingredient.objects.filter(user=self.user)
         self.assertEqual(ingredients.count(), 2)
 
-        def payload_maker(**kwargs) -> dict:
-            return kwargs
-        payload = payload_maker(
+        payload = dict(
             title='Tofu Stir-Fry',
             time_minutes=20,
             price=Decimal('9.99'),
@@ -381,12 +430,13 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertIn(ingredient1, recipe.ingredients.all())
         self.assertIn(ingredient2, recipe.ingredients.all())
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
+        ingredient_names = set(
+            recipe.ingredients.filter(
                 user=self.user
-            ).exists()
-            self.assertTrue(exists)
+            ).values_list('name', flat=True)
+        )
+        for ingredient in payload['ingredients']:
+            self.assertIn(ingredient['name'], ingredient_names)
         
         self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 4)
 
@@ -405,12 +455,12 @@ class PrivateRecipeAPITests(TestCase):
 
     def test_update_recipe_assign_ingredient(self):
         """Test assigning an existing ingredient with updating a recipe."""
-        ingredient1 = Ingredient.objects.create(user=self.user, name='pepper')
+        ingredient1, ingredient2 = Ingredient.objects.bulk_create([
+            Ingredient(user=self.user, name='pepper'),
+            Ingredient(user=self.user, name='salt'),
+        ])
         recipe = create_recipe(user=self.user)
         recipe.ingredients.add(ingredient1)
-
-        ingredient2 = Ingredient.objects.create(user=self.user, name='salt')
-            # create second ingredient
         payload = {'ingredients': [{'name': 'salt'}]}
             # reference second ingredient
         url = detail_url(recipe.id)
@@ -438,8 +488,10 @@ class PrivateRecipeAPITests(TestCase):
         """Test filtering recipes by tags."""
         r1 = create_recipe(user=self.user, title="Thai Vegetable Curry")
         r2 = create_recipe(user=self.user, title='Aubergine with Tahini')
-        tag1 = Tag.objects.create(user=self.user, name='Vegan')
-        tag2 = Tag.objects.create(user=self.user, name='Vegetarian')
+        tag1, tag2 = Tag.objects.bulk_create([
+            Tag(user=self.user, name='Vegan'),
+            Tag(user=self.user, name='Vegetarian'),
+        ])
 
         r1.tags.add(tag1)
         r2.tags.add(tag2)
@@ -449,20 +501,20 @@ class PrivateRecipeAPITests(TestCase):
         params = {'tags':f'{tag1.id},{tag2.id}'}
         res = self.client.get(RECIPES_URL,params)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
+        s1, s2, s3 = RecipeSerializer([r1, r2, r3], many=True).data
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1, res.data)
+        self.assertIn(s2, res.data)
+        self.assertNotIn(s3, res.data)
     
     def test_filter_by_ingredients(self):
         """Test filtering recipes by ingredients."""
         r1 = create_recipe(user=self.user, title="Posh Beans on Toast")
         r2 = create_recipe(user=self.user, title="Chicken Cacciatore")
-        in1 = Ingredient.objects.create(user=self.user, name="Feta Cheese")
-        in2 = Ingredient.objects.create(user=self.user, name="Chicken")
+        in1, in2 = Ingredient.objects.bulk_create([
+            Ingredient(user=self.user, name="Feta Cheese"),
+            Ingredient(user=self.user, name="Chicken"),
+        ])
         r1.ingredients.add(in1)
         r2.ingredients.add(in1)
 
@@ -471,24 +523,26 @@ class PrivateRecipeAPITests(TestCase):
         params = {"ingredients":f'{in1.id},{in2.id}'}
         res = self.client.get(RECIPES_URL, params)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
+        s1, s2, s3 = RecipeSerializer([r1, r2, r3], many=True).data
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1, res.data)
+        self.assertIn(s2, res.data)
+        self.assertNotIn(s3, res.data)
 
 class ImageUploadTests(TestCase):
     """Tests for the image upload API."""
+    client_class = APIClient
 
-    def setUp(self):
-        """called on each test to setup basics for each case."""
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """called once to create data shared by every case."""
+        cls.user = User.objects.create_user(
             'user@example.com',
             'P@ssword+123'
         )
+
+    def setUp(self):
+        """called on each test to setup basics for each case."""
         self.client.force_authenticate(self.user)
         self.recipe = create_recipe(user=self.user)
     
@@ -4,7 +4,7 @@ Tests for the tags API.
 from decimal import Decimal
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -13,21 +13,24 @@ from core.models import Tag, Recipe
 
 from recipe.serializers import TagSerializer
 
+User = get_user_model()
+
 TAGS_URL = reverse('recipe:tag-list')
+TAG_DETAIL_PREFIX = reverse(
+    'recipe:tag-detail', args=[0]
+).rsplit('0/', 1)[0]
 
 def create_user(email='user@example.com', password='testpass123'):
     """Create and return a user."""
-    return get_user_model().objects.create_user(email, password)
+    return User.objects.create_user(email, password)
 
 def detail_url(tag_id):
     """Create and return a tag detail url."""
-    return reverse('recipe:tag-detail', args=[tag_id])
+    return f'{TAG_DETAIL_PREFIX}{tag_id}/'
 
-class PublicTagsApiTests(TestCase):
+class PublicTagsApiTests(SimpleTestCase):
     """Test unauthenticated API requests."""
-
-    def setUp(self) -> None:
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test that Authorization is required for retieving tags."""
@@ -37,27 +40,30 @@ class PublicTagsApiTests(TestCase):
 
 class PrivateTagsApiTests(TestCase):
     """Test authenticated API requests."""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
 
     def setUp(self) -> None:
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_tags(self):
         """Test retrieving a list of tags."""
-        Tag.objects.create(user=self.user, name='Vegan')
-        Tag.objects.create(user=self.user, name='Dessert')
-            # Creating test tags
+        Tag.objects.bulk_create([
+            Tag(user=self.user, name='Vegan'),
+            Tag(user=self.user, name='Dessert'),
+        ]) # Creating test tags
         
         res = self.client.get(TAGS_URL)
             # Sending GET request to Client
         
-        tags = Tag.objects.all().order_by('-name')
-        serializer = TagSerializer(tags, many=True)
-            # Fetch and serialize objects
-        
+        tags = Tag.objects.order_by('-name').values('id', 'name')
+            # Fetch expected rows, no serializer pass needed
+
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data, list(tags))
     
     def test_tags_limited_to_user(self):
         """Test that list of tags is limited to authenticated user."""
@@ -88,6 +94,17 @@ class PrivateTagsApiTests(TestCase):
         self.assertEqual(tag.name, payload['name'])
             # Testing response and data
     
+    def test_update_tag_duplicate_name(self):
+        """Test renaming a tag to a name the user already has fails."""
+        Tag.objects.create(user=self.user, name='Vegan')
+        tag = Tag.objects.create(user=self.user, name='Dessert')
+
+        res = self.client.patch(detail_url(tag.id), {'name': 'Vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Dessert')
+
     def test_delete_tag(self):
         """Test deleting a tag."""
         tag = Tag.objects.create(user=self.user, name="breakfast")
@@ -97,14 +114,15 @@ class PrivateTagsApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
             # Check that we get HTTP 204 NO CONTENT
-        tags = Tag.objects.filter(pk=tag.id)
-        self.assertFalse(tags.exists())
+        self.assertFalse(Tag.objects.filter(pk=tag.id).exists())
             # check that our tag no longer exists.
 
     def test_filter_tags_assigned_to_recipes(self):
         """Test listing tags to those assigned to recipes."""
-        tag1 = Tag.objects.create(user=self.user, name="Breakfast")
-        tag2 = Tag.objects.create(user=self.user, name="Lunch")
+        tag1, tag2 = Tag.objects.bulk_create([
+            Tag(user=self.user, name="Breakfast"),
+            Tag(user=self.user, name="Lunch"),
+        ])
         recipe = Recipe.objects.create(
             user=self.user,
             title="Overnight Oats",
@@ -113,7 +131,8 @@ class PrivateTagsApiTests(TestCase):
         )
         recipe.tags.add(tag1)
 
-        res = self.client.get(TAGS_URL, {"assigned_only": 1})
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
         s1 = TagSerializer(tag1)
         s2 = TagSerializer(tag2)
@@ -123,22 +142,28 @@ class PrivateTagsApiTests(TestCase):
 
     def test_filtered_tags_are_unique(self):
         """Test filtered tags returns a unique list."""
-        tag = Tag.objects.create(user=self.user, name="Breakfast")
-        Tag.objects.create(user=self.user, name="Dinner")
-        recipe1 = Recipe.objects.create(
-            user=self.user,
-            title="Vegan Pancakes",
-            time_minutes=25,
-            price=Decimal("7.63"),
-        )
-        recipe2 = Recipe.objects.create(
-            user=self.user,
-            title="Overnight Oats",
-            price=Decimal("1.99"),
-            time_minutes=5,
-        )
-        recipe1.tags.add(tag)
-        recipe2.tags.add(tag)
+        tag, _ = Tag.objects.bulk_create([
+            Tag(user=self.user, name="Breakfast"),
+            Tag(user=self.user, name="Dinner"),
+        ])
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=self.user,
+                title="Vegan Pancakes",
+                time_minutes=25,
+                price=Decimal("7.63"),
+            ),
+            Recipe(
+                user=self.user,
+                title="Overnight Oats",
+                price=Decimal("1.99"),
+                time_minutes=5,
+            ),
+        ])
+        RecipeTag = Recipe.tags.through
+        RecipeTag.objects.bulk_create([
+            RecipeTag(recipe=recipe, tag=tag) for recipe in recipes
+        ]) # link "Breakfast" to both recipes in one INSERT
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
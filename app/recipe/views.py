@@ -56,7 +56,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
             ingredient_ids = self._params_to_ints(ingredients)
             queryset = queryset.filter(ingredients__id__in=ingredient_ids)
 
-        return queryset.filter(user=self.request.user).order_by('-id').distinct()
+        prefetch = getattr(self.get_serializer_class().Meta, 'PREFETCH', ())
+            # nested serializers declare the relations they render
+        return queryset.filter(
+            user=self.request.user
+        ).prefetch_related(*prefetch).order_by('-id').distinct()
     
     def get_serializer_class(self):
         """Return the serializer class for request."""
@@ -109,8 +113,19 @@ class BaseRecipeAttrViewSet(mixins.UpdateModelMixin,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return queryset.filter(user=self.request.user).order_by('-name').distinct()
+            queryset = queryset.filter(recipe__isnull=False).distinct()
+                # the recipe join repeats rows, dedupe them in SQL
+        fields = self.get_serializer_class().Meta.fields
+            # only load the columns the serializer exposes
+        return queryset.filter(
+            user=self.request.user
+        ).only(*fields).order_by('-name')
+
+    def list(self, request, *args, **kwargs):
+        """List objects as plain dicts, skipping per-row serialization."""
+        fields = self.get_serializer_class().Meta.fields
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(list(queryset.values(*fields)))
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage Tags in the database."""
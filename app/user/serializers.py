@@ -21,13 +21,17 @@ class UserSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """Update and return user."""
         password = validated_data.pop("password", None)
-        user = super().update(instance, validated_data)
+        update_fields = list(validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
 
         if password is not None:
-            user.set_password(password)
-            user.save()
-        
-        return user
+            instance.set_password(password)
+            update_fields.append("password")
+
+        instance.save(update_fields=update_fields)
+            # single UPDATE limited to the changed columns
+        return instance
 
 class AuthTokenSerializer(serializers.Serializer):
     """Serializer for the user auth token."""
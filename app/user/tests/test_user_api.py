@@ -1,41 +1,70 @@
 """
 Tests for the user API.
 """
-from django.test import TestCase
+from types import MappingProxyType
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
-from rest_framework.test import APIClient
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate,
+)
 from rest_framework import status
 
+from user.views import ManageUserView
+
+User = get_user_model()
+
 # returns full URL path
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
 ME_URL = reverse("user:me")
 
+# 'me' view called directly, skipping URL routing and middleware
+ME_VIEW = ManageUserView.as_view()
+
+# read-only payloads shared by tests, copy with {**PAYLOAD} to change them
+DEFAULT_USER_PAYLOAD = MappingProxyType({
+    'email': 'test@example.com',
+    'password': 'password+123',
+    'name': 'John Doe',
+})
+TOKEN_USER = MappingProxyType({
+    'name': 'Jessica Jones',
+    'email': 'test1@example.com',
+    'password': 'TestWord#!9876',
+})
+
 def create_user(**params):
     """Create and return a new User."""
-    return get_user_model().objects.create_user(**params)
+    return User.objects.create_user(**params)
 
 class PublicUserApiTests(TestCase):
     """Test the public features of the user API."""
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_user(**TOKEN_USER)
+            # one user for every token test, hashed once per class
     
     def test_create_user_success(self):
         """Test creating a user is successful."""
         # Payload to pass in
-        payload = {
-            'email': 'test@example.com',
-            'password': 'password+123',
-            'name': 'John Doe',
-        }
+        payload = DEFAULT_USER_PAYLOAD
         # Post Data to endpoint
         res = self.client.post(CREATE_USER_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        user = get_user_model().objects.get(email=payload['email'])
-        self.assertTrue(user.has_usable_password, 'Does not have usable password')
+        user = User.objects.get(email=payload['email'])
+        self.assertTrue(
+            user.has_usable_password(),
+            'Does not have usable password')
         self.assertNotEqual(user.password, payload['password'])
         self.assertTrue(
             user.check_password(payload['password']),
@@ -44,12 +73,7 @@ class PublicUserApiTests(TestCase):
     
     def test_user_with_email_exists_error(self):
         """Test error returned if user with email exists"""
-        # same as previous payload / should we make it class variable?
-        payload = {
-            'email': 'test@example.com',
-            'password': 'password+123',
-            'name': 'John Doe',
-        }
+        payload = DEFAULT_USER_PAYLOAD
         # pass dictionary in as kwargs - defined above
         create_user(**payload)
         res = self.client.post(CREATE_USER_URL, payload)
@@ -58,96 +82,58 @@ class PublicUserApiTests(TestCase):
     
     def test_password_too_short_error(self):
         """Test an error is returned if password is less than 5 characters."""
-        payload = {
-            'email': 'test@example.com',
-            'password': 'abc',
-            'name': 'John Doe',
-        }
+        payload = {**DEFAULT_USER_PAYLOAD, 'password': 'abc'}
         res = self.client.post(CREATE_USER_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
-        user_exists = get_user_model().objects.filter(
+        user_exists = User.objects.filter(
             email=payload['email']
         ).exists()
         self.assertFalse(user_exists)
     
     def test_create_token_for_user(self):
         """Test generate token for valid credentials."""
-        user_detials = {
-            'name': 'Jessica Jones',
-            'email': 'test1@example.com',
-            'password': 'TestWord#!9876',
-        }
-        create_user(**user_detials)
         # We don't need 'name' to login
         payload = {
-            'email': user_detials['email'],
-            'password': user_detials['password']
+            'email': TOKEN_USER['email'],
+            'password': TOKEN_USER['password']
         }
         res = self.client.post(TOKEN_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('token', res.data)
     
-    def test_create_token_bad_email(self):
-        """Test returns error if email credentials are invalid."""
-        user_detials = {
-            'name': 'Matthew Murdock',
-            'email': 'test2@example.com',
-            'password': 'TestWord#!9876',
-        }
-        create_user(**user_detials)
-        # We don't need 'name' to login
-        # Testing Wrong Email
-        payload = {
-            'email': 'wrong_email@example.com',
-            'password': user_detials['password'],
-        }
-        res = self.client.post(TOKEN_URL, payload)
+    def test_create_token_invalid_credentials(self):
+        """Test returns error if credentials are invalid."""
+        cases = [
+            ('wrong_email', {
+                'email': 'wrong_email@example.com',
+                'password': TOKEN_USER['password'],
+            }),
+            ('blank_email', {
+                'email': '',
+                'password': TOKEN_USER['password'],
+            }),
+            ('wrong_password', {
+                'email': TOKEN_USER['email'],
+                'password': '$Wrong_Password=123',
+            }),
+            ('blank_password', {
+                'email': TOKEN_USER['email'],
+                'password': '',
+            }),
+        ]
+        for name, payload in cases:
+            with self.subTest(case=name):
+                res = self.client.post(TOKEN_URL, payload)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertNotIn('token', res.data)
+
+class PublicUserApiNoDbTests(SimpleTestCase):
+    """Test the public features of the user API that skip the database."""
+    client_class = APIClient
 
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertNotIn('token', res.data)
-
-        # Blank Email?
-        payload = {
-            'email': '',
-            'password': user_detials['password'],
-        }
-        res = self.client.post(TOKEN_URL, payload)
-        
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertNotIn('token', res.data)
-
-    def test_create_token_bad_password(self):
-        """Test returns error if Password credentials are invalid."""
-        user_detials = {
-            'name': 'Tony Stark',
-            'email': 'test3@example.com',
-            'password': 'TestWord#!9876',
-        }
-
-        create_user(**user_detials)
-        # We don't need 'name' to login
-        # Testing Wrong Password
-        payload = {
-            'email': user_detials['email'],
-            'password': '$Wrong_Password=123',
-        }
-        res = self.client.post(TOKEN_URL, payload)
-
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertNotIn('token', res.data)
-
-        # Blank Password?
-        payload = {
-            'email': user_detials['email'],
-            'password': '',
-        }
-        res = self.client.post(TOKEN_URL, payload)
-        
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertNotIn('token', res.data)
-    
     def test_retrieve_user_unauthorized(self):
         """Test authentication is required for users."""
         res = self.client.get(ME_URL)
@@ -156,20 +142,24 @@ class PublicUserApiTests(TestCase):
 
 class PrivateUserApiTests(TestCase):
     """Test API requests that require authentication."""
+    client_class = APIClient
+    factory = APIRequestFactory()
 
-    def setUp(self):
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email="test@example.com",
-            password="testPass+123",
             name="Kali Linux",
-        )
-        # instantiate the APIClient to make requests
-        self.client = APIClient()
+        ) # no password: requests use force_authenticate, skip the hasher
+
+    def setUp(self):
         self.client.force_authenticate(user=self.user)
     
     def test_retrieve_profile_success(self):
         """Test retrieving profile for logged in user."""
-        res = self.client.get(ME_URL)
+        request = self.factory.get(ME_URL)
+        force_authenticate(request, user=self.user)
+        res = ME_VIEW(request)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, {
@@ -179,7 +169,9 @@ class PrivateUserApiTests(TestCase):
     
     def test_POST_me_not_allowed(self):
         """Test POST is not allowed for the 'me' endpoint."""
-        res = self.client.post(ME_URL, {})
+        request = self.factory.post(ME_URL, {})
+        force_authenticate(request, user=self.user)
+        res = ME_VIEW(request)
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
     
@@ -190,9 +182,18 @@ class PrivateUserApiTests(TestCase):
             'password': 'Updated_Password+987',
         }
 
-        res = self.client.patch(ME_URL, payload)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(ME_URL, payload)
         # since we've changed the user, we need to grab the new value
-        self.user.refresh_from_db()
+        self.user.refresh_from_db(fields=['name', 'password'])
+
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"email"', updates[0])
+            # only the changed columns are written
 
         # Check that values have been updated
         self.assertEqual(self.user.name, payload['name'])
@@ -2,7 +2,6 @@
 Views for the user API.
 """
 
-from django.shortcuts import render
 from rest_framework import generics, authentication, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings